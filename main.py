@@ -2,7 +2,8 @@ import os
 import json
 import uuid
 import asyncio
-from src.graph import app
+from src.runner import stream_product
+from src.cache.prompt_cache import PROMPT_CACHE
 from src.logger.logger import setup_logger
 
 logger = setup_logger("main")
@@ -25,35 +26,35 @@ async def main():
     os.makedirs("output", exist_ok=True)
 
     try:
-        initial_state = {
-            "run_id": run_id, 
-            "raw_input": RAW_DATA, 
-            "generated_pages": []
-        }
-        
-        final_state = await app.ainvoke(initial_state)
-        
-        logger.info("Execution Complete. Saving files...", extra={"run_id": run_id})
-        
-        if "generated_pages" in final_state:
-            for page in final_state["generated_pages"]:
-                for key, content in page.items():
-                    filename = f"output/{key}.json"
-                    with open(filename, "w") as f:
-                        json.dump(content, f, indent=2)
-                    logger.info(f"Saved: {filename}", extra={"run_id": run_id})
-
-            fq = [p for p in final_state["generated_pages"] if "faq" in p]
-            if fq:
-                faq_content = fq[0]["faq"]
+        # Pages are saved as soon as each writer finishes, not after the whole graph.
+        async for event in stream_product(RAW_DATA, run_id=run_id):
+            if event["type"] == "section":
+                print(f"[Stream] {event['page_key']} section {event['index'] + 1}: {event['section']['heading']}")
+                continue
+            if event["type"] == "page_check":
+                if event["blueprint_check"] != "VALID":
+                    print(f"[Stream] {event['page_key']} blueprint check: {event['blueprint_check']}")
+                continue
+
+            # No page sink is configured here, so page events carry the page itself.
+            key = event["page_key"]
+            content = event["page"]
+            filename = f"output/{key}.json"
+            with open(filename, "w") as f:
+                json.dump(content, f, indent=2)
+            logger.info(f"Saved: {filename}", extra={"run_id": run_id})
+
+            if key == "faq":
                 count = 0
-                for sec in faq_content['sections']:
-                    for block in sec['blocks']:
-                        if block['type'] == 'faq':
-                            count += len(block['qa_pairs'])
+                for sec in content['sections']:
+                    if isinstance(sec['content'], list):
+                        count += sum(1 for item in sec['content'] if 'question_text' in item)
                             
                 logger.info(f"Final Check: FAQ Page contains {count} questions.", extra={"run_id": run_id})
 
+        logger.info("Execution Complete.", extra={"run_id": run_id})
+        logger.info(f"Prompt cache report: {PROMPT_CACHE.report()}", extra={"run_id": run_id})
+
     except Exception as e:
         logger.error(f"Execution Crashed: {e}", extra={"run_id": run_id})
         import traceback
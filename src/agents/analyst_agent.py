@@ -1,87 +1,120 @@
 # src/agents/analyst.py
 import os
+from langchain_core.runnables import RunnableConfig
 from langchain_google_genai import ChatGoogleGenerativeAI
 from src.state.state import AgentState
 from src.schemas.models import ProductData, CompetitorOutputSchema
 from src.tools.logic import clean_price_string, validate_competitor_logic
+from src.cache.prompt_cache import PROMPT_CACHE
+from src.sinks.page_sink import get_page_sink
+from src.limits.quota import acquire_quota
 from src.logger.logger import setup_logger, monitor_node
 
 logger = setup_logger(__name__)
 
-@monitor_node
-def analyst_node(state: AgentState):
-    print("[Analyst] Ingesting & Cleaning Data...")
-    raw = state['raw_input']
+ANALYST_MODEL = "gemini-2.5-flash-lite"
+
+_COMPETITOR_PREFIX = """
+        TASK: Generate a DIRECT COMPETITOR profile for the product in INPUT DATA below.
     
-    price_val = clean_price_string.invoke(raw["Price"])
+        CONSTRAINTS:
+            1. Name: Realistic brand (e.g., 'DermaPure'). NO 'Product B'.
+            2. Pricing: Target 15-20% difference (Higher or Lower).
+            3. Differentiation:
+                {ingredient_rule}
     
-    product = ProductData(
-        name=raw["Product Name"],
-        concentration=raw.get("Concentration"),
-        skin_type=[x.strip() for x in raw["Skin Type"].split(",")],
-        key_ingredients=[x.strip() for x in raw["Key Ingredients"].split(",")],
-        benefits=[x.strip() for x in raw["Benefits"].split(",")],
-        how_to_use=raw["How to Use"],
-        side_effects=raw["Side Effects"],
-        price=price_val
-    )
+        OUTPUT: Valid JSON 'CompetitorProduct'.
+"""
+
+COMPETITOR_PREFIX_INGREDIENTS = _COMPETITOR_PREFIX.format(
+    ingredient_rule="- Ingredients: Must share 1 key ingredient, add 1 unique active."
+)
+COMPETITOR_PREFIX_SPECS = _COMPETITOR_PREFIX.format(
+    ingredient_rule="- Specs: Compare material quality or durability instead of ingredients."
+)
+
+@monitor_node
+def analyst_node(state: AgentState, config: RunnableConfig = None):
+    product = state.get("product")
+    release = {"raw_input": None} if get_page_sink(config) else {}
+
+    if product is None:
+        print("[Analyst] Ingesting & Cleaning Data...")
+        raw = state['raw_input']
+        
+        price_val = clean_price_string.invoke(raw["Price"])
+        
+        product = ProductData(
+            name=raw["Product Name"],
+            concentration=raw.get("Concentration"),
+            skin_type=[x.strip() for x in raw["Skin Type"].split(",")],
+            key_ingredients=[x.strip() for x in raw["Key Ingredients"].split(",")],
+            benefits=[x.strip() for x in raw["Benefits"].split(",")],
+            how_to_use=raw["How to Use"],
+            side_effects=raw["Side Effects"],
+            price=price_val
+        )
+
+    if state.get("comparison_feasible") is False:
+        print("[Analyst] No comparable price. Skipping Competitor Profile.")
+        return {"product": product, "competitor": None, **release}
 
     logger.info("Generating Competitor Profile...", extra={"run_id": state.get("run_id")})
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash-lite",
-        temperature=0.5,
-        api_key=os.environ["GEMINI_API_KEY"],
-        max_retries=2,
-    )
-    
     print("[Analyst] Generating Competitor Profile...")
-    structured_llm = llm.with_structured_output(CompetitorOutputSchema)
     
-    ingredient_rule = ""
     if product.key_ingredients:
-        ingredient_rule = "- Ingredients: Must share 1 key ingredient, add 1 unique active."
+        prefix_name, prefix = "analyst:ingredients", COMPETITOR_PREFIX_INGREDIENTS
     else:
-        ingredient_rule = "- Specs: Compare material quality or durability instead of ingredients."
+        prefix_name, prefix = "analyst:specs", COMPETITOR_PREFIX_SPECS
 
-    prompt = f"""
-        TASK: Generate a DIRECT COMPETITOR profile for: '{product.name}'.
-    
+    payload = f"""
         INPUT DATA:
+            - Product: '{product.name}'
             - Type: {product.skin_type}
-            - Price: {product.price} {product.price}
+            - Price: {product.price}
             {f"- Ingredients: {product.key_ingredients}" if product.key_ingredients else ""}
-    
-        CONSTRAINTS:
-            1. Name: Realistic brand (e.g., 'DermaPure'). NO 'Product B'.
-            2. Pricing: Target 15-20% difference (Higher or Lower).
-            3. Differentiation:
-                {ingredient_rule}
-    
-        OUTPUT: Valid JSON 'CompetitorProduct'.
     """
     
     max_retries = 3
-    current_prompt = prompt
+    current_payload = payload
     
     for i in range(max_retries):
+        cached_content = None
         try:
-            result = structured_llm.invoke(current_prompt)
+            prompt, cached_content = PROMPT_CACHE.compose(prefix_name, prefix, current_payload, ANALYST_MODEL)
+
+            llm = ChatGoogleGenerativeAI(
+                model=ANALYST_MODEL,
+                temperature=0.5,
+                api_key=os.environ["GEMINI_API_KEY"],
+                # Retries happen in this loop so each one passes through the quota.
+                max_retries=0,
+                cached_content=cached_content,
+            )
+            structured_llm = llm.with_structured_output(CompetitorOutputSchema)
+
+            acquire_quota()
+            result = structured_llm.invoke(prompt)
             
             val_msg = validate_competitor_logic(product, result.competitor)
             
             if val_msg == "VALID":
                 print("[Analyst] Competitor Generated & Validated.")
+                # raw_input has no consumer after ingestion.
                 return {
                     "product": product,
-                    "competitor": result.competitor
+                    "competitor": result.competitor,
+                    **release
                 }
             else:
                 print(f"[Analyst] Competitor Validation Failed: {val_msg}")
-                current_prompt = prompt + f"\n\n[SYSTEM ERROR]: {val_msg}. Regenerate."
+                current_payload = payload + f"\n\n[SYSTEM ERROR]: {val_msg}. Regenerate."
                 
         except Exception as e:
             print(f"[Analyst] Error: {e}")
-            current_prompt += f"\n[ERROR]: {e}"
+            # The handle may have expired server-side; next attempt sends the prefix inline.
+            PROMPT_CACHE.invalidate(cached_content)
+            current_payload += f"\n[ERROR]: {e}"
 
     raise ValueError("Failed to generate valid competitor.")
\ No newline at end of file
@@ -6,6 +6,8 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 from src.state.state import AgentState
 from src.schemas.models import UserQuestion
+from src.cache.prompt_cache import PROMPT_CACHE
+from src.limits.quota import aacquire_quota
 from src.logger.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -15,6 +17,19 @@ TARGET_PER_CATEGORY = 3
 
 CONCURRENCY_LIMIT = 3 
 
+FAQ_MODEL = "gemini-1.5-flash"
+
+FAQ_BATCH_PREFIX = f"""
+        TASK: Generate exactly {TARGET_PER_CATEGORY} User Questions + Answers for the CATEGORY given below.
+        
+        RULES:
+        1. Category field in JSON must be the CATEGORY given below.
+        2. Answers must be concise and helpful.
+        3. Questions should be distinct and specific to the product ingredients/usage.
+        
+        OUTPUT: JSON Object with a list of questions.
+"""
+
 class BatchQuestionOutput(BaseModel):
     questions: List[UserQuestion] = Field(
         description=f"List of exactly {TARGET_PER_CATEGORY} questions for the specific category."
@@ -37,23 +52,18 @@ async def generate_category_batch(
         
         logger.info(f"Triggering Batch: {category}", extra={"run_id": run_id})
         
-        structured_llm = llm.with_structured_output(BatchQuestionOutput)
-        
-        prompt = f"""
+        payload = f"""
+        CATEGORY: '{category}'
         CONTEXT: {context_str}
-        
-        TASK: Generate exactly {TARGET_PER_CATEGORY} User Questions + Answers for the category: '{category}'.
-        
-        RULES:
-        1. Category field in JSON must be '{category}'.
-        2. Answers must be concise and helpful.
-        3. Questions should be distinct and specific to the product ingredients/usage.
-        
-        OUTPUT: JSON Object with a list of questions.
         """
         
         for attempt in range(3):
+            prompt, cached_content = PROMPT_CACHE.compose("faq:category_batch", FAQ_BATCH_PREFIX, payload, FAQ_MODEL)
+            attempt_llm = llm.model_copy(update={"cached_content": cached_content}) if cached_content else llm
+            structured_llm = attempt_llm.with_structured_output(BatchQuestionOutput)
+
             try:
+                await aacquire_quota()
                 result = await structured_llm.ainvoke(prompt)
                 
                 if len(result.questions) >= TARGET_PER_CATEGORY:
@@ -67,6 +77,7 @@ async def generate_category_batch(
                     f"Batch {category} Attempt {attempt+1} failed: {e}", 
                     extra={"run_id": run_id}
                 )
+                PROMPT_CACHE.invalidate(cached_content)
                 await asyncio.sleep(1)
         
         logger.error(f"Batch {category} Failed completely.", extra={"run_id": run_id})
@@ -81,10 +92,11 @@ async def faq_specialist_node(state: AgentState):
     
     # Initialize LLM
     llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
+        model=FAQ_MODEL,
         temperature=0.7,
         api_key=os.environ["GEMINI_API_KEY"],
-        max_retries=1
+        # Retries happen in generate_category_batch so each one passes through the quota.
+        max_retries=0
     )
     
     sem = asyncio.Semaphore(CONCURRENCY_LIMIT)
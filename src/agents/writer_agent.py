@@ -1,17 +1,50 @@
 import os
+import time
+from typing import Dict, Optional
+from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.json import parse_partial_json
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.config import get_stream_writer
+from pydantic import ValidationError
 from src.state.state import AgentState
-from src.schemas.models import PageOutput
-from src.templates.registry import TEMPLATE_REGISTRY, PageLayout
+from src.schemas.models import PageOutput, PageSection
+from src.templates.registry import TEMPLATE_REGISTRY, PageLayout, resolve_variant_layout
+from src.cache.prompt_cache import PROMPT_CACHE
+from src.sinks.page_sink import get_page_sink
+from src.limits.quota import acquire_quota
+from src.tools.logic import validate_section_blueprint, validate_page_blueprint
 from src.logger.logger import setup_logger, monitor_node
 
 logger = setup_logger(__name__)
 
+WRITER_MODEL = "gemini-2.5-flash-lite"
+
+WRITER_MAX_ATTEMPTS = 3
+
+PAGE_OUTPUT_JSON_SCHEMA = PageOutput.model_json_schema()
+
+BLOCK_DEFINITIONS = """
+BLOCK DEFINITIONS:
+- 'text': HTML Paragraphs.
+- 'list': Bullet points (ordered/unordered).
+- 'faq': List of Question/Answer objects.
+- 'table': Headers and Rows.
+
+GLOBAL RULES:
+1. Follow the SECTION BLUEPRINT exactly. Do not add sections not listed.
+2. Adhere to the 'CONSTRAINT' for block types in each section.
+3. For SEO, generate a slug based on the primary product name.
+"""
+
 def render_layout_instructions(layout: PageLayout) -> str:
     """
     Dynamic Prompt Construction (The Composition Engine).
     Converts the Python Object Blueprint into strict LLM instructions.
+    Rendered once per layout instance and cached on it.
     """
+    if layout._instructions is not None:
+        return layout._instructions
+
     instructions = [f"PAGE GOAL: {layout.page_type_name} - {layout.description}\n"]
     
     instructions.append("SECTION BLUEPRINT (You must adhere to this structure):")
@@ -27,12 +60,169 @@ def render_layout_instructions(layout: PageLayout) -> str:
         """
         instructions.append(block_instr)
         
-    return "\n".join(instructions)
+    layout._instructions = "\n".join(instructions)
+    return layout._instructions
+
+def render_static_prefix(layout: PageLayout) -> str:
+    """
+    Everything in the writer prompt that does not depend on the product:
+    role, layout blueprint, block definitions and global rules.
+    Kept byte-identical across calls so providers can cache it.
+    """
+    if layout._static_prefix is None:
+        layout._static_prefix = (
+            "ROLE: Headless CMS Renderer.\n\n"
+            f"{render_layout_instructions(layout)}\n"
+            f"{BLOCK_DEFINITIONS}\n"
+        )
+    return layout._static_prefix
+
+def _emit_section(run_id: str, output_key: str, layout_obj: PageLayout, idx: int, raw_section: Dict) -> bool:
+    """
+    Validates one finished section and pushes it to the custom stream.
+    Returns False (and emits nothing) if the section fails schema validation.
+    """
+    try:
+        section = PageSection.model_validate(raw_section)
+    except ValidationError as e:
+        logger.warning(f"Section {idx} of {output_key} failed schema validation: {e}", extra={"run_id": run_id})
+        return False
+
+    if idx < len(layout_obj.structure):
+        blueprint = layout_obj.structure[idx]
+        section_id = blueprint.section_id
+        check = validate_section_blueprint(section, blueprint)
+    else:
+        section_id = None
+        check = f"BLUEPRINT ERROR: Section {idx + 1} is not in the '{layout_obj.layout_id}' blueprint."
+
+    if check != "VALID":
+        logger.warning(check, extra={"run_id": run_id})
+
+    get_stream_writer()({
+        "type": "section",
+        "run_id": run_id,
+        "page_key": output_key,
+        "index": idx,
+        "section_id": section_id,
+        "blueprint_check": check,
+        "section": section.model_dump(mode='json'),
+    })
+    return True
+
+def render_page(
+    state: AgentState,
+    layout_obj: PageLayout,
+    output_key: str,
+    temperature: float = 0.5,
+    tone: Optional[str] = None
+) -> PageOutput:
+    """
+    Renders one page from the upstream product/competitor/questions.
+    Streams the JSON output and emits each section on the custom stream as
+    soon as the next one starts (or the page ends). The finished output is
+    parsed strictly, and missing blueprint sections are flagged.
+    Tone goes after the data so variants still share the layout prefix.
+    """
+    run_id = state.get("run_id")
+    context = {
+        "primary": state['product'].model_dump(),
+        "competitor": state['competitor'].model_dump() if state.get('competitor') else None,
+        "questions": [q.model_dump() for q in state['questions']]
+    }
+
+    payload = f"DATA CONTEXT:\n{context}\n"
+    if tone:
+        payload += f"\nTONE: Write all copy in a {tone} tone.\n"
+    
+    # `stalled` stops mid-stream emission at a section that failed validation;
+    # it and every later section are emitted from the validated page instead.
+    emitted = 0
+    for attempt in range(WRITER_MAX_ATTEMPTS):
+        buffer, stalled = "", False
+        prompt, cached_content = PROMPT_CACHE.compose(
+            f"writer:{layout_obj.layout_id}",
+            render_static_prefix(layout_obj),
+            payload,
+            WRITER_MODEL,
+        )
+
+        llm = ChatGoogleGenerativeAI(
+            model=WRITER_MODEL,
+            temperature=temperature,
+            api_key=os.environ["GEMINI_API_KEY"],
+            cached_content=cached_content,
+            # Retries happen in this loop so each one passes through the quota.
+            max_retries=0
+        )
+        
+        # Same request as `with_structured_output(..., method="json_schema")`, but we keep
+        # the raw text so the finished page can be parsed strictly.
+        json_llm = llm.bind(response_mime_type="application/json", response_json_schema=PAGE_OUTPUT_JSON_SCHEMA)
+        
+        try:
+            acquire_quota()
+            for chunk in json_llm.stream(prompt):
+                buffer += chunk.text
+                partial = parse_partial_json(buffer)
+                sections = (partial.get("sections") or []) if isinstance(partial, dict) else []
+                # A section is complete once the model has started the next one.
+                while not stalled and emitted < len(sections) - 1:
+                    if _emit_section(run_id, output_key, layout_obj, emitted, sections[emitted]):
+                        emitted += 1
+                    else:
+                        stalled = True
+            # A stream cut off mid-page fails here instead of passing as a shorter page.
+            result = PageOutput.model_validate_json(buffer)
+            break
+        except Exception as e:
+            # Sections already pushed to the stream cannot be taken back, so only retry before any output.
+            if emitted or attempt == WRITER_MAX_ATTEMPTS - 1:
+                raise
+            logger.warning(
+                f"Writer {output_key} Attempt {attempt+1} failed: {e}",
+                extra={"run_id": run_id}
+            )
+            # The cached prefix may have expired server-side; the next attempt sends it inline.
+            PROMPT_CACHE.invalidate(cached_content)
+            time.sleep(1)
+
+    for idx in range(emitted, len(result.sections)):
+        _emit_section(run_id, output_key, layout_obj, idx, result.sections[idx].model_dump())
+
+    check = validate_page_blueprint(result, layout_obj)
+    if check != "VALID":
+        logger.warning(check, extra={"run_id": run_id})
+    get_stream_writer()({
+        "type": "page_check",
+        "run_id": run_id,
+        "page_key": output_key,
+        "blueprint_check": check,
+    })
+
+    return result
+
+def emit_page(run_id: str, output_key: str, result: PageOutput, config: RunnableConfig = None) -> Dict:
+    """
+    Hands the page to the configured sink, or returns it in state.
+    Either way a 'page' event is pushed to the custom stream.
+    """
+    page = result.model_dump(mode='json')
+    page_sink = get_page_sink(config)
+    stream = get_stream_writer()
+
+    if page_sink:
+        ref = page_sink.write(run_id, output_key, page)
+        stream({"type": "page", "run_id": run_id, "page_key": output_key, "ref": ref})
+        return {"page_refs": [ref]}
+    
+    stream({"type": "page", "run_id": run_id, "page_key": output_key, "page": page})
+    return {"generated_pages": [{output_key: page}]}
 
 def writer_node_factory(page_key: str):
 
     @monitor_node
-    def write_page(state: AgentState):
+    def write_page(state: AgentState, config: RunnableConfig = None):
         run_id = state.get("run_id")
 
         layout_obj = TEMPLATE_REGISTRY.get(page_key)
@@ -42,45 +232,28 @@ def writer_node_factory(page_key: str):
         logger.info(f"Rendering {page_key}...", extra={"run_id": run_id})   
         print(f"[Writer] Rendering Layout: {layout_obj.page_type_name}...")
         
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash-lite",
-            temperature=0.5,
-            api_key=os.environ["GEMINI_API_KEY"]
-        )
-        
-        structured_llm = llm.with_structured_output(PageOutput)
-        
-        context = {
-            "primary": state['product'].model_dump(),
-            "competitor": state['competitor'].model_dump(),
-            "questions": [q.model_dump() for q in state['questions']]
-        }
-        
-        layout_instructions = render_layout_instructions(layout_obj)
-        
-        prompt = f"""
-        ROLE: Headless CMS Renderer.
-        
-        {layout_instructions}
-        
-        DATA CONTEXT:
-        {context}
-        
-        BLOCK DEFINITIONS:
-        - 'text': HTML Paragraphs.
-        - 'list': Bullet points (ordered/unordered).
-        - 'faq': List of Question/Answer objects.
-        - 'table': Headers and Rows.
-        
-        GLOBAL RULES:
-        1. Follow the SECTION BLUEPRINT exactly. Do not add sections not listed.
-        2. Adhere to the 'CONSTRAINT' for block types in each section.
-        3. For SEO, generate a slug based on the primary product name.
-        """
-        
-        result = structured_llm.invoke(prompt)
+        result = render_page(state, layout_obj, page_key)
         print(f"[Writer] Rendered {page_key}.")
+
+        return emit_page(run_id, page_key, result, config)
         
-        return {"generated_pages": [{page_key: result.model_dump(mode='json')}]}
-        
-    return write_page
\ No newline at end of file
+    return write_page
+
+@monitor_node
+def write_variant(state: AgentState, config: RunnableConfig = None):
+    """
+    Renders one PageVariant. Invoked once per variant via `Send`, so all
+    variants of a run share a single analyst and FAQ pass.
+    """
+    run_id = state.get("run_id")
+    variant = state["variant"]
+    layout_obj = resolve_variant_layout(variant)
+
+    output_key = f"{variant.page_key}.{variant.variant_id}"
+    logger.info(f"Rendering variant {output_key}...", extra={"run_id": run_id})
+    print(f"[Writer] Rendering Variant: {output_key} ({layout_obj.page_type_name})...")
+
+    result = render_page(state, layout_obj, output_key, temperature=variant.temperature, tone=variant.tone)
+    print(f"[Writer] Rendered {output_key}.")
+
+    return emit_page(run_id, output_key, result, config)
@@ -0,0 +1,157 @@
+import os
+import time
+import hashlib
+import threading
+from typing import Dict, Optional, Set, Tuple
+from src.logger.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class LocalPrefixCache:
+    """
+    Local stand-in for a provider context cache.
+    Sends the full prompt (prefix + payload) but records how often each
+    static prefix is reused, so we can measure the share of input that
+    a provider-side cache would have served.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prefixes: Dict[str, Dict] = {}
+        self.prefix_chars = 0
+        self.payload_chars = 0
+        self.reused_chars = 0
+
+    @staticmethod
+    def prefix_key(name: str, prefix: str, model: str) -> str:
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        return f"{model}:{name}:{digest}"
+
+    def register(self, name: str, prefix: str, model: str) -> Optional[str]:
+        """
+        Records a use of `prefix`. Returns a provider cache handle,
+        or None when the prefix must be sent inline.
+        """
+        key = self.prefix_key(name, prefix, model)
+        with self._lock:
+            entry = self._prefixes.get(key)
+            if entry is None:
+                entry = {"name": name, "model": model, "chars": len(prefix), "uses": 0}
+                self._prefixes[key] = entry
+            else:
+                self.reused_chars += len(prefix)
+            entry["uses"] += 1
+            self.prefix_chars += len(prefix)
+        return None
+
+    def invalidate(self, handle: Optional[str]):
+        """Forgets a provider cache handle after a request using it failed."""
+
+    def compose(self, name: str, prefix: str, payload: str, model: str) -> Tuple[str, Optional[str]]:
+        """
+        Returns (prompt, cached_content). When the prefix is served from a
+        provider cache, only the payload is sent with the request.
+        """
+        handle = self.register(name, prefix, model)
+        with self._lock:
+            self.payload_chars += len(payload)
+        if handle:
+            return payload, handle
+        return prefix + payload, None
+
+    def report(self) -> Dict:
+        with self._lock:
+            total = self.prefix_chars + self.payload_chars
+            return {
+                "backend": type(self).__name__,
+                "distinct_prefixes": len(self._prefixes),
+                "prefix_uses": sum(e["uses"] for e in self._prefixes.values()),
+                "prefix_chars": self.prefix_chars,
+                "payload_chars": self.payload_chars,
+                "reused_prefix_chars": self.reused_chars,
+                "reusable_share": round(self.reused_chars / total, 4) if total else 0.0,
+            }
+
+
+class GeminiContextCache(LocalPrefixCache):
+    """
+    Registers each static prefix with the Gemini context cache
+    (`client.caches.create`) and returns the cache name, which callers
+    pass to `ChatGoogleGenerativeAI(cached_content=...)`.
+    Handles are re-registered shortly before their TTL lapses. Falls back
+    to sending the prefix inline if registration fails (e.g. the prefix is
+    below the provider's minimum cacheable size), while another thread is
+    registering it, or after a request with the handle failed.
+    """
+    # Re-register this many seconds before the server-side cache expires.
+    REFRESH_MARGIN_S = 120
+    # After a request fails with a handle, send the prefix inline this long.
+    FAILURE_BACKOFF_S = 300
+
+    def __init__(self, ttl: str = "3600s"):
+        super().__init__()
+        self.ttl = ttl
+        self.ttl_seconds = float(ttl.rstrip("s"))
+        # key -> (handle or None, monotonic time after which to re-register)
+        self._handles: Dict[str, Tuple[Optional[str], float]] = {}
+        self._registering: Set[str] = set()
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+        return self._client
+
+    def register(self, name: str, prefix: str, model: str) -> Optional[str]:
+        super().register(name, prefix, model)
+        key = self.prefix_key(name, prefix, model)
+
+        with self._lock:
+            entry = self._handles.get(key)
+            if entry and time.monotonic() < entry[1]:
+                return entry[0]
+            if key in self._registering:
+                return None
+            self._registering.add(key)
+
+        # Network call made outside the lock so other prompts are not blocked.
+        refresh_at = time.monotonic() + max(0.0, self.ttl_seconds - self.REFRESH_MARGIN_S)
+        try:
+            from google.genai import types
+            cache = self._get_client().caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=key,
+                    contents=[prefix],
+                    ttl=self.ttl,
+                ),
+            )
+            handle = cache.name
+            logger.info(f"Registered context cache for {name}: {handle}")
+        except Exception as e:
+            handle = None
+            logger.warning(f"Context cache unavailable for {name}, sending prefix inline: {e}")
+
+        with self._lock:
+            self._handles[key] = (handle, refresh_at)
+            self._registering.discard(key)
+        return handle
+
+    def invalidate(self, handle: Optional[str]):
+        if not handle:
+            return
+        retry_at = time.monotonic() + self.FAILURE_BACKOFF_S
+        with self._lock:
+            for key, (cached, _) in list(self._handles.items()):
+                if cached == handle:
+                    self._handles[key] = (None, retry_at)
+        logger.warning(f"Dropped context cache handle {handle}, sending prefix inline")
+
+
+def build_prompt_cache() -> LocalPrefixCache:
+    backend = os.environ.get("PROMPT_CACHE_BACKEND", "local").lower()
+    if backend == "gemini":
+        return GeminiContextCache(ttl=os.environ.get("PROMPT_CACHE_TTL", "3600s"))
+    return LocalPrefixCache()
+
+PROMPT_CACHE = build_prompt_cache()
@@ -1,20 +1,32 @@
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
-from typing import Literal, List    
+from langgraph.types import Send
+from typing import Literal, List, Union
+from langchain_core.runnables import RunnableConfig
 
 from src.state.state import AgentState
 from src.agents.analyst_agent import analyst_node
 from src.agents.faq_agent import faq_specialist_node
-from src.agents.writer_agent import writer_node_factory
+from src.agents.writer_agent import writer_node_factory, write_variant
+from src.sinks.page_sink import get_page_sink
+from src.templates.registry import resolve_variant_layout, layout_requires_competitor
+from src.logger.logger import setup_logger, memory_usage, MEMORY_DEBUG
 
 load_dotenv()
 
+logger = setup_logger(__name__)
+
 def decide_comparison_feasibility(state: AgentState) -> Literal["write_comparison", "skip_comparison"]:
     """
     Conditional Logic:
     Only generate a comparison page if we have valid prices for BOTH
     the primary product and the competitor.
+    Records pre-checked by bulk ingestion are skipped without looking further.
     """
+    if state.get("comparison_feasible") is False or state.get("competitor") is None:
+        print("[Router] No comparable price. SKIPPING Comparison Page.")
+        return "skip_comparison"
+
     product_price = state.get("product").price
     competitor_price = state.get("competitor").price
     
@@ -26,6 +38,58 @@ def decide_comparison_feasibility(state: AgentState) -> Literal["write_compariso
         return "skip_comparison"
 
 
+def fan_out_variants(state: AgentState) -> Union[List[Send], str]:
+    """
+    Variant Mode Routing:
+    One writer invocation per requested variant, all in the same step.
+    Comparison variants, and any variant whose layout draws on competitor
+    data, are dropped when the comparison is not feasible. If that leaves
+    nothing to write, the run goes straight to release_upstream.
+    """
+    comparison_ok = decide_comparison_feasibility(state) == "write_comparison"
+    shared = {k: state.get(k) for k in ("run_id", "product", "competitor", "questions")}
+
+    sends = []
+    for variant in state.get("variants", []):
+        needs_competitor = (
+            variant.page_key == "comparison"
+            or layout_requires_competitor(resolve_variant_layout(variant))
+        )
+        if needs_competitor and not comparison_ok:
+            continue
+        sends.append(Send("write_variant", {**shared, "variant": variant}))
+
+    print(f"[Router] Fanning out {len(sends)} page variants.")
+    return sends or "release_upstream"
+
+
+def release_upstream(state: AgentState, config: RunnableConfig = None):
+    """
+    Runs after every writer has finished.
+    With MEMORY_DEBUG set, records the serialized size of this run's
+    upstream models, which is attributable to the run (unlike process RSS,
+    which mixes in every run in flight). In streaming mode (a page sink is
+    configured) those models are then dropped from state so they can be
+    collected before `ainvoke` returns.
+    """
+    update = {}
+    if MEMORY_DEBUG:
+        run_id = state.get("run_id", "unknown-run")
+        update["upstream_serialized_bytes"] = sum(
+            len(m.model_dump_json())
+            for m in [state.get("product"), state.get("competitor"), *(state.get("questions") or [])]
+            if m is not None
+        )
+        logger.info(
+            f"Upstream state: {update['upstream_serialized_bytes']} serialized bytes (process RSS sampled at run end)",
+            extra={"run_id": run_id, **memory_usage()}
+        )
+
+    if get_page_sink(config):
+        update.update({"product": None, "competitor": None, "questions": None})
+    return update
+
+
 def build_graph():
     workflow = StateGraph(AgentState)
 
@@ -35,6 +99,7 @@ def build_graph():
     workflow.add_node("write_faq", writer_node_factory("faq"))
     workflow.add_node("write_product", writer_node_factory("product"))
     workflow.add_node("write_comparison", writer_node_factory("comparison"))
+    workflow.add_node("release_upstream", release_upstream)
 
     workflow.set_entry_point("analyst")
     
@@ -52,10 +117,35 @@ def build_graph():
         }
     )
 
-    workflow.add_edge("write_faq", END)
-    workflow.add_edge("write_product", END)
-    workflow.add_edge("write_comparison", END)
+    # All writers run in the same step, so release_upstream runs once after them.
+    workflow.add_edge("write_faq", "release_upstream")
+    workflow.add_edge("write_product", "release_upstream")
+    workflow.add_edge("write_comparison", "release_upstream")
+    workflow.add_edge("release_upstream", END)
+
+    return workflow.compile()
+
+
+def build_variant_graph():
+    """
+    Same upstream as build_graph, but a single analyst and FAQ pass feeds
+    one writer invocation per entry in state["variants"].
+    """
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("analyst", analyst_node)
+    workflow.add_node("faq_specialist", faq_specialist_node)
+    workflow.add_node("write_variant", write_variant)
+    workflow.add_node("release_upstream", release_upstream)
+
+    workflow.set_entry_point("analyst")
+
+    workflow.add_edge("analyst", "faq_specialist")
+    workflow.add_conditional_edges("faq_specialist", fan_out_variants, ["write_variant", "release_upstream"])
+    workflow.add_edge("write_variant", "release_upstream")
+    workflow.add_edge("release_upstream", END)
 
     return workflow.compile()
 
-app = build_graph()
\ No newline at end of file
+app = build_graph()
+variant_app = build_variant_graph()
\ No newline at end of file
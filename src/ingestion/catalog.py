@@ -0,0 +1,249 @@
+import re
+import sys
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from pydantic import ValidationError
+from src.schemas.models import ProductData, IngestionRejection, IngestionReport
+from src.logger.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+REQUIRED_FIELDS = ["Product Name", "Skin Type", "Key Ingredients", "Benefits", "How to Use"]
+
+# Checked in order; the first symbol found in a price string wins.
+CURRENCY_SYMBOLS = [
+    ("₹", "INR"), ("Rs", "INR"), ("INR", "INR"),
+    ("$", "USD"), ("USD", "USD"),
+    ("€", "EUR"), ("EUR", "EUR"),
+    ("£", "GBP"), ("GBP", "GBP"),
+]
+
+# Currency markers removed before the remaining token is parsed.
+_CURRENCY_RE = re.compile(r"₹|Rs\.?|INR|\$|USD|€|EUR|£|GBP")
+
+# Each pattern must match the whole numeric token.
+_PLAIN_RE = re.compile(r"^\d+(?:\.\d+)?$")                             # 699, 12.50
+_GROUPED_RE = re.compile(r"^\d{1,3}(?:,\d{3})+(?:\.\d+)?$")            # 1,699.00
+_LAKH_RE = re.compile(r"^\d{1,2}(?:,\d{2})*,\d{3}(?:\.\d+)?$")         # 1,00,000 (INR)
+_EUR_PLAIN_RE = re.compile(r"^\d+(?:\.\d{1,2})?$")                     # 12.50
+_EUR_GROUPED_RE = re.compile(r"^\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?$")    # 1.699,50
+_EUR_DECIMAL_RE = re.compile(r"^\d+,\d{1,2}$")                         # 12,50
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def parse_terms(value: Union[str, List[str], None]) -> List[str]:
+    """
+    Accepts a comma-separated string or a list of strings and returns the
+    stripped, non-empty terms. Raises ValueError for any other type.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        terms = value.split(",")
+    elif isinstance(value, (list, tuple)) and all(isinstance(x, str) for x in value):
+        terms = value
+    else:
+        raise ValueError(f"Expected a string or list of strings, got {value!r}")
+    return [x.strip() for x in terms if x.strip()]
+
+
+class Vocabulary:
+    """
+    Interns ingredient/benefit/skin-type terms, so the same term shares
+    one string object across the whole catalog. Terms are kept exactly
+    as written; 'vitamin c' and 'Vitamin C' stay distinct.
+    """
+    def __init__(self):
+        self._terms: Dict[str, str] = {}
+
+    def intern(self, term: str) -> str:
+        canonical = self._terms.get(term)
+        if canonical is None:
+            canonical = sys.intern(term)
+            self._terms[canonical] = canonical
+        return canonical
+
+    def intern_all(self, terms: List[str]) -> List[str]:
+        return [self.intern(t) for t in terms]
+
+    def split(self, value: Union[str, List[str], None]) -> List[str]:
+        """Parses `value` with `parse_terms` and interns every term."""
+        return self.intern_all(parse_terms(value))
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+def _parse_price_token(token: str, currency: str) -> Tuple[float, str]:
+    """Returns (price, '') or (nan, rejection reason) for one cleaned token."""
+    if "-" in token or "+" in token:
+        return np.nan, "signed price"
+
+    if currency == "EUR":
+        if _EUR_PLAIN_RE.match(token):
+            return float(token), ""
+        if _EUR_GROUPED_RE.match(token) or _EUR_DECIMAL_RE.match(token):
+            return float(token.replace(".", "").replace(",", ".")), ""
+    else:
+        if _PLAIN_RE.match(token):
+            return float(token), ""
+        if _GROUPED_RE.match(token) or (currency == "INR" and _LAKH_RE.match(token)):
+            return float(token.replace(",", "")), ""
+
+    if not any(c.isdigit() for c in token):
+        return np.nan, "no number"
+    return np.nan, "ambiguous or malformed number"
+
+
+def clean_prices(values: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cleans a whole column of raw price strings at once.
+    Returns (prices, currencies, errors):
+      - prices: float array, 0.0 where the price is missing or rejected
+      - currencies: ISO code per row, '' when no symbol was found
+      - errors: rejection reason per row, '' when the price is missing or valid
+    The numeric part must be a single well-formed token. A decimal comma is
+    only accepted for EUR. Signs, repeated dots and ambiguous separators are
+    rejected rather than coerced.
+    """
+    arr = np.asarray(["" if v is None else str(v) for v in values], dtype=str)
+    stripped = np.char.strip(arr)
+    missing = stripped == ""
+
+    currencies = np.full(arr.shape, "", dtype="<U3")
+    for symbol, code in CURRENCY_SYMBOLS:
+        hit = (np.char.find(stripped, symbol) >= 0) & (currencies == "")
+        currencies[hit] = code
+
+    tokens = [_CURRENCY_RE.sub("", s).replace(" ", "") for s in stripped]
+    parsed = [(np.nan, "") if m else _parse_price_token(t, c)
+              for t, c, m in zip(tokens, currencies, missing)]
+
+    prices = np.array([p for p, _ in parsed], dtype=float)
+    errors = np.array([e for _, e in parsed], dtype=object)
+    prices = np.where(np.isnan(prices), 0.0, prices)
+    return prices, currencies, errors
+
+
+def is_comparison_feasible(product: ProductData) -> bool:
+    """The product half of `decide_comparison_feasibility`, known before any LLM call."""
+    return product.price > 0
+
+
+def _ingest_batch(
+    batch: List[Dict],
+    offset: int,
+    vocab: Vocabulary,
+    products: List[ProductData],
+    rejections: List[IngestionRejection]
+):
+    columns = {
+        field: [r.get(field) if isinstance(r, dict) else None for r in batch]
+        for field in REQUIRED_FIELDS + ["Concentration", "Side Effects", "Price"]
+    }
+    prices, currencies, price_errors = clean_prices(columns["Price"])
+
+    for i, raw in enumerate(batch):
+        index = offset + i
+        name = columns["Product Name"][i]
+        # Rejections must never fail themselves, whatever the record holds.
+        reported_name = name if isinstance(name, str) else None
+
+        if not isinstance(raw, dict):
+            rejections.append(IngestionRejection(index=index, reason="Record is not an object."))
+            continue
+
+        missing = [f for f in REQUIRED_FIELDS if not columns[f][i]]
+        if missing:
+            rejections.append(IngestionRejection(index=index, product_name=reported_name, reason=f"Missing fields: {missing}"))
+            continue
+
+        if price_errors[i]:
+            rejections.append(IngestionRejection(
+                index=index, product_name=reported_name, reason=f"Unparseable price ({price_errors[i]}): {columns['Price'][i]!r}"
+            ))
+            continue
+
+        try:
+            skin_type = parse_terms(columns["Skin Type"][i])
+            key_ingredients = parse_terms(columns["Key Ingredients"][i])
+            benefits = parse_terms(columns["Benefits"][i])
+        except ValueError as e:
+            rejections.append(IngestionRejection(index=index, product_name=reported_name, reason=f"Invalid list field: {e}"))
+            continue
+
+        try:
+            product = ProductData(
+                name=name,
+                concentration=columns["Concentration"][i],
+                skin_type=skin_type,
+                key_ingredients=key_ingredients,
+                benefits=benefits,
+                how_to_use=columns["How to Use"][i],
+                side_effects=columns["Side Effects"][i],
+                price=float(prices[i]),
+                currency=str(currencies[i]) or None
+            )
+        except ValidationError as e:
+            rejections.append(IngestionRejection(
+                index=index, product_name=reported_name, reason=f"Validation error: {e.errors()[0]['msg']}"
+            ))
+            continue
+
+        # Interned only once the record is accepted, so rejected records
+        # never add terms to the vocabulary.
+        product.skin_type = vocab.intern_all(product.skin_type)
+        product.key_ingredients = vocab.intern_all(product.key_ingredients)
+        product.benefits = vocab.intern_all(product.benefits)
+        products.append(product)
+
+
+def ingest_records(
+    records: List[Dict],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    vocab: Optional[Vocabulary] = None
+) -> Tuple[List[ProductData], IngestionReport]:
+    """
+    Parses and validates a whole catalog into ProductData, column by column
+    in batches of `batch_size`. Invalid records are reported, not raised.
+    """
+    vocab = vocab or Vocabulary()
+    products: List[ProductData] = []
+    rejections: List[IngestionRejection] = []
+
+    for offset in range(0, len(records), batch_size):
+        _ingest_batch(records[offset:offset + batch_size], offset, vocab, products, rejections)
+
+    report = IngestionReport(
+        total=len(records),
+        accepted=len(products),
+        rejections=rejections,
+        comparison_infeasible=sum(1 for p in products if not is_comparison_feasible(p)),
+        vocabulary_size=len(vocab)
+    )
+
+    print(f"[Ingestion] Accepted {report.accepted}/{report.total} records ({len(rejections)} rejected).")
+    logger.info(
+        f"Ingested {report.accepted}/{report.total} records, {len(rejections)} rejected, "
+        f"{report.comparison_infeasible} without a comparable price, {report.vocabulary_size} vocabulary terms."
+    )
+    for r in rejections:
+        logger.warning(f"Rejected record {r.index} ({r.product_name}): {r.reason}")
+
+    return products, report
+
+
+def load_catalog(path: Union[str, Path]) -> List[Dict]:
+    """Reads a catalog from a JSON array file or a JSON Lines file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return json.loads(text)
+
+
+def ingest_catalog(path: Union[str, Path], batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[List[ProductData], IngestionReport]:
+    return ingest_records(load_catalog(path), batch_size=batch_size)
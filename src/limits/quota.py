@@ -0,0 +1,69 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from typing import Optional
+
+class SharedQuota:
+    """
+    Token-bucket request quota that can be shared across worker processes.
+    State lives in shared memory (`multiprocessing.Value`) guarded by a
+    process-shared lock, so every worker draws from one global budget.
+    Pass the instance to workers as a Process argument and call
+    `install_quota` there.
+    """
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(self.rate)))
+        self._lock = ctx.Lock()
+        self._tokens = ctx.Value("d", self.capacity, lock=False)
+        self._updated = ctx.Value("d", time.time(), lock=False)
+        self._granted = ctx.Value("q", 0, lock=False)
+
+    def _reserve(self) -> float:
+        """Takes one token if available. Returns 0, or seconds to wait."""
+        with self._lock:
+            now = time.time()
+            elapsed = max(0.0, now - self._updated.value)
+            self._tokens.value = min(self.capacity, self._tokens.value + elapsed * self.rate)
+            self._updated.value = now
+
+            if self._tokens.value >= 1.0:
+                self._tokens.value -= 1.0
+                self._granted.value += 1
+                return 0.0
+            return (1.0 - self._tokens.value) / self.rate
+
+    def acquire(self):
+        while (wait := self._reserve()) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+
+    @property
+    def granted(self) -> int:
+        with self._lock:
+            return self._granted.value
+
+
+_QUOTA: Optional[SharedQuota] = None
+
+def install_quota(quota: Optional[SharedQuota]):
+    """Sets the quota used by all LLM calls in this process."""
+    global _QUOTA
+    _QUOTA = quota
+
+def acquire_quota():
+    """Blocks until the global quota allows one more LLM request (no-op if unset)."""
+    if _QUOTA is not None:
+        _QUOTA.acquire()
+
+async def aacquire_quota():
+    if _QUOTA is not None:
+        await _QUOTA.aacquire()
+
+if os.environ.get("LLM_REQUESTS_PER_MINUTE"):
+    install_quota(SharedQuota(float(os.environ["LLM_REQUESTS_PER_MINUTE"])))
@@ -2,6 +2,9 @@ import logging
 import json
 import time
 import functools
+import os
+import sys
+import resource
 from datetime import datetime
 from pathlib import Path
 
@@ -24,6 +27,10 @@ class JsonFormatter(logging.Formatter):
             log_record["duration_ms"] = record.duration_ms
         if hasattr(record, "node_name"):
             log_record["node_name"] = record.node_name
+        if hasattr(record, "rss_kb"):
+            log_record["rss_kb"] = record.rss_kb
+        if hasattr(record, "peak_rss_kb"):
+            log_record["peak_rss_kb"] = record.peak_rss_kb
 
         return json.dumps(log_record)
 
@@ -44,6 +51,26 @@ def setup_logger(name: str):
 
     return logger
 
+# Serializing state to measure it costs CPU, so per-run size figures that
+# need it are only computed when MEMORY_DEBUG is set.
+MEMORY_DEBUG = os.environ.get("MEMORY_DEBUG", "").lower() in ("1", "true", "yes")
+
+def memory_usage() -> dict:
+    """
+    Current and peak resident set size of this process, in KB.
+    Current RSS is read from /proc and is None where unavailable.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024  # reported in bytes on macOS
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return {"rss_kb": current, "peak_rss_kb": peak}
+
 def monitor_node(func):
     """
     Decorator to log node entry, exit, and execution time with Run ID.
@@ -0,0 +1,149 @@
+import json
+import uuid
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Union
+from src.graph import app, variant_app
+from src.schemas.models import ProductData
+from src.schemas.layouts import PageVariant
+from src.templates.registry import validate_variants
+from src.ingestion.catalog import is_comparison_feasible
+from src.sinks.page_sink import JsonFilePageSink
+from src.logger.logger import setup_logger, memory_usage, MEMORY_DEBUG
+
+logger = setup_logger(__name__)
+
+def _prepare_run(
+    record: Union[Dict, ProductData],
+    page_sink: Optional[JsonFilePageSink],
+    run_id: str,
+    variants: Optional[List[PageVariant]]
+):
+    initial_state = {
+        "run_id": run_id,
+        "generated_pages": [],
+        "page_refs": []
+    }
+    if isinstance(record, ProductData):
+        initial_state["product"] = record
+        initial_state["comparison_feasible"] = is_comparison_feasible(record)
+    else:
+        initial_state["raw_input"] = record
+    if variants:
+        validate_variants(variants)
+        initial_state["variants"] = variants
+    config = {"configurable": {"page_sink": page_sink}} if page_sink else None
+
+    graph = variant_app if variants else app
+    return graph, initial_state, config
+
+
+async def run_product(
+    record: Union[Dict, ProductData],
+    page_sink: Optional[JsonFilePageSink] = None,
+    run_id: Optional[str] = None,
+    variants: Optional[List[PageVariant]] = None
+) -> Dict:
+    """
+    Runs the graph for one product: either a raw record or a ProductData
+    already produced by bulk ingestion (which skips parsing, and skips
+    comparison work up front when the price is not comparable).
+    With `variants`, one analyst/FAQ pass feeds every variant's writer and
+    pages are keyed '<page_key>.<variant_id>'.
+    With a page sink, pages are written as soon as each writer finishes and
+    the returned summary only carries page references.
+    """
+    run_id = run_id or str(uuid.uuid4())
+    graph, initial_state, config = _prepare_run(record, page_sink, run_id, variants)
+
+    mem_before = memory_usage()
+    final_state = await graph.ainvoke(initial_state, config=config)
+    mem_after = memory_usage()
+
+    generated_pages = final_state.get("generated_pages", [])
+    page_refs = final_state.get("page_refs", [])
+    if page_sink:
+        # Already measured by the sink when it wrote each page.
+        page_bytes = sum(ref["bytes"] for ref in page_refs)
+    elif MEMORY_DEBUG:
+        page_bytes = sum(len(json.dumps(content, indent=2)) for page in generated_pages for content in page.values())
+    else:
+        page_bytes = None
+
+    summary = {
+        "run_id": run_id,
+        "page_refs": page_refs,
+        # Serialized sizes attributable to this run. Figures that would need
+        # an extra serialization pass are None unless MEMORY_DEBUG is set.
+        "serialized_bytes": {
+            "pages": page_bytes,
+            "upstream": final_state.get("upstream_serialized_bytes"),
+        },
+        # Process-wide samples taken at the run's boundaries; under
+        # run_catalog they include every other run in flight.
+        "process_memory": {
+            "rss_kb_at_start": mem_before["rss_kb"],
+            "rss_kb_at_end": mem_after["rss_kb"],
+            "peak_rss_kb": mem_after["peak_rss_kb"],
+        },
+    }
+    if not page_sink:
+        summary["generated_pages"] = generated_pages
+
+    logger.info(
+        f"Run finished: {page_bytes} page bytes, {summary['serialized_bytes']['upstream']} upstream bytes (serialized)",
+        extra={"run_id": run_id, **mem_after}
+    )
+    return summary
+
+
+async def stream_product(
+    record: Union[Dict, ProductData],
+    page_sink: Optional[JsonFilePageSink] = None,
+    run_id: Optional[str] = None,
+    variants: Optional[List[PageVariant]] = None
+) -> AsyncIterator[Dict]:
+    """
+    Same run as `run_product`, but yields writer events as they happen:
+      - {"type": "section", "page_key", "index", "section_id", "blueprint_check", "section"}
+        as soon as each page section is complete
+      - {"type": "page_check", "page_key", "blueprint_check"} once a page's sections are all in
+      - {"type": "page", "page_key", "page" | "ref"} when a page is finished
+    """
+    run_id = run_id or str(uuid.uuid4())
+    graph, initial_state, config = _prepare_run(record, page_sink, run_id, variants)
+
+    async for event in graph.astream(initial_state, config=config, stream_mode="custom"):
+        yield event
+
+
+async def run_catalog(
+    records: List[Union[Dict, ProductData]],
+    page_sink: JsonFilePageSink,
+    concurrency: int = 8,
+    variants: Optional[List[PageVariant]] = None
+) -> List[Dict]:
+    """
+    Runs many products concurrently in streaming mode.
+    At most `concurrency` products are in flight, so peak memory tracks
+    concurrency rather than catalog size. Failed runs are reported, not raised.
+    """
+    if variants:
+        validate_variants(variants)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _run(record: Union[Dict, ProductData]) -> Dict:
+        async with sem:
+            run_id = str(uuid.uuid4())
+            try:
+                return await run_product(record, page_sink=page_sink, run_id=run_id, variants=variants)
+            except Exception as e:
+                logger.error(f"Run failed: {e}", extra={"run_id": run_id})
+                return {"run_id": run_id, "error": str(e)}
+
+    results = await asyncio.gather(*[_run(record) for record in records])
+
+    logger.info(
+        f"Catalog finished: {len(results)} runs, {page_sink.pages_written} pages, {page_sink.bytes_written} bytes",
+        extra=memory_usage()
+    )
+    return results
@@ -1,5 +1,5 @@
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 BlockTypeLiteral = Literal["text", "list", "faq", "table"]
 
@@ -7,6 +7,8 @@ class SectionBlueprint(BaseModel):
     """
     Defines the structural requirements for a single section of a page.
     """
+    model_config = ConfigDict(frozen=True)
+
     section_id: str = Field(..., description="Unique internal ID (e.g., 'hero_section')")
     heading_default: str = Field(..., description="Default H2 heading")
     
@@ -18,8 +20,34 @@ class SectionBlueprint(BaseModel):
 class PageLayout(BaseModel):
     """
     Defines the composition of a full page.
+    Frozen, so the writer can cache its rendered prompt text on the instance.
     """
+    model_config = ConfigDict(frozen=True)
+
     layout_id: str
     page_type_name: str
     description: str
-    structure: List[SectionBlueprint]
\ No newline at end of file
+    structure: List[SectionBlueprint]
+
+    # Filled in by the writer on first use (render_layout_instructions / render_static_prefix).
+    _instructions: Optional[str] = PrivateAttr(default=None)
+    _static_prefix: Optional[str] = PrivateAttr(default=None)
+
+    def model_copy(self, *, update=None, deep: bool = False) -> "PageLayout":
+        # A copy may change fields, so it must not inherit the rendered text.
+        copy = super().model_copy(update=update, deep=deep)
+        copy._instructions = copy._static_prefix = None
+        return copy
+
+class PageVariant(BaseModel):
+    """
+    One variant of a page rendered from shared upstream results.
+    Alternate layouts must be registered in TEMPLATE_REGISTRY under their
+    own key.
+    """
+    # Becomes part of a file name, so no path separators or dots.
+    variant_id: str = Field(..., pattern=r"^[A-Za-z0-9_-]+$", description="Suffix for the output key (e.g. 'b' -> 'product.b')")
+    page_key: Literal["faq", "product", "comparison"]
+    layout_key: Optional[str] = Field(None, description="TEMPLATE_REGISTRY key; defaults to page_key")
+    temperature: float = 0.5
+    tone: Optional[str] = Field(None, description="Copy tone, e.g. 'playful' or 'clinical'")
@@ -11,6 +11,7 @@ class ProductData(BaseModel):
     how_to_use: str
     side_effects: Optional[str] = None
     price: float
+    currency: Optional[str] = None
 
 class CompetitorProduct(BaseModel):
     name: str
@@ -39,4 +40,17 @@ class PageOutput(BaseModel):
     page_type: str
     meta_title: str
     meta_description: str
-    sections: List[PageSection]
\ No newline at end of file
+    sections: List[PageSection]
+
+
+class IngestionRejection(BaseModel):
+    index: int = Field(..., description="Position of the record in the source catalog")
+    product_name: Optional[str] = None
+    reason: str
+
+class IngestionReport(BaseModel):
+    total: int
+    accepted: int
+    rejections: List[IngestionRejection]
+    comparison_infeasible: int
+    vocabulary_size: int
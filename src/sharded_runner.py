@@ -0,0 +1,191 @@
+import os
+import uuid
+import asyncio
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from src.limits.quota import SharedQuota, install_quota
+from src.schemas.models import ProductData
+from src.logger.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Item = Tuple[int, Union[Dict, ProductData]]
+
+def _worker_main(
+    worker_id: int,
+    isolated: List[Item],
+    items: List[Item],
+    batch_id: str,
+    quota: Optional[SharedQuota],
+    events,
+    output_dir: str,
+    concurrency: int,
+    run_item: Optional[Callable[..., Awaitable[Dict]]] = None
+):
+    """
+    Worker process entry point. Each worker builds its own event loop and
+    its own compiled graph, and reports on `events` (its end of a Pipe)
+    when each item starts and finishes.
+    `isolated` items are run one at a time before the rest, so a crash
+    while running one of them points at that item alone.
+    `run_item` replaces `run_product` (used by tests).
+    """
+    if quota is not None:
+        install_quota(quota)
+
+    if run_item is None:
+        # Imported here so each spawned worker compiles its own `app`.
+        from src.runner import run_product as run_item
+    from src.sinks.page_sink import JsonFilePageSink
+
+    page_sink = JsonFilePageSink(output_dir)
+
+    async def _run_shard():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _run(idx: int, record: Union[Dict, ProductData]):
+            async with sem:
+                # Deterministic run_id: a restarted item overwrites its own output.
+                run_id = f"{batch_id}-{idx}"
+                events.send(("started", worker_id, idx, {"run_id": run_id}))
+                try:
+                    summary = await run_item(record, page_sink=page_sink, run_id=run_id)
+                    events.send(("done", worker_id, idx, {"run_id": run_id, "pages": len(summary["page_refs"])}))
+                except Exception as e:
+                    logger.error(f"Run failed: {e}", extra={"run_id": run_id})
+                    events.send(("failed", worker_id, idx, {"run_id": run_id, "error": str(e)}))
+
+        for idx, record in isolated:
+            await _run(idx, record)
+        await asyncio.gather(*[_run(idx, record) for idx, record in items])
+
+    asyncio.run(_run_shard())
+
+
+def run_sharded(
+    records: List[Union[Dict, ProductData]],
+    workers: Optional[int] = None,
+    requests_per_minute: Optional[float] = None,
+    concurrency_per_worker: int = 8,
+    output_dir: str = "output",
+    max_restarts: int = 3,
+    run_item: Optional[Callable[..., Awaitable[Dict]]] = None
+) -> Dict:
+    """
+    Splits the catalog (raw records or pre-ingested ProductData) across
+    worker processes that share one request quota. `requests_per_minute`
+    defaults to LLM_REQUESTS_PER_MINUTE when that is set.
+    When a worker dies, only the items it was running are suspected:
+      - a single in-flight item is quarantined (reported as failed);
+      - several in-flight items are re-run one at a time, so the next
+        crash names the culprit.
+    The worker is restarted with every item it had not finished. A worker
+    that dies with nothing in flight is restarted up to `max_restarts`
+    times before its remaining items are abandoned.
+    Returns a merged progress report.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(records) or 1))
+    ctx = multiprocessing.get_context("spawn")
+    # Without this, each spawned worker would build its own env-var quota
+    # and the combined rate would scale with the number of workers.
+    if requests_per_minute is None and os.environ.get("LLM_REQUESTS_PER_MINUTE"):
+        requests_per_minute = float(os.environ["LLM_REQUESTS_PER_MINUTE"])
+    quota = SharedQuota(requests_per_minute, ctx=ctx) if requests_per_minute else None
+    batch_id = str(uuid.uuid4())
+
+    pending = {w: set(range(w, len(records), workers)) for w in range(workers)}
+    in_flight = {w: set() for w in range(workers)}
+    suspects = {w: set() for w in range(workers)}
+    restarts = {w: 0 for w in range(workers)}
+    idle_crashes = {w: 0 for w in range(workers)}
+    completed: Dict[int, Dict] = {}
+    failed: Dict[int, Dict] = {}
+
+    def _start(w: int):
+        isolated = [(idx, records[idx]) for idx in sorted(suspects[w])]
+        items = [(idx, records[idx]) for idx in sorted(pending[w] - suspects[w])]
+        reader, writer = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_worker_main,
+            args=(w, isolated, items, batch_id, quota, writer, output_dir, concurrency_per_worker, run_item),
+            daemon=True
+        )
+        proc.start()
+        # Only the worker holds the write end, so its exit shows up as EOF.
+        writer.close()
+        logger.info(f"Started worker {w} with {len(isolated) + len(items)} items, {len(isolated)} isolated (pid {proc.pid})")
+        return proc, reader
+
+    def _finish(idx: int, info: Dict, ok: bool):
+        (completed if ok else failed)[idx] = info
+        finished = len(completed) + len(failed)
+        print(f"[Shards] {finished}/{len(records)} finished ({len(failed)} failed)")
+        logger.info(f"Progress: {finished}/{len(records)} finished, {len(failed)} failed", extra={"run_id": info["run_id"]})
+
+    def _handle(event):
+        kind, w, idx, info = event
+        if idx not in pending[w]:
+            return
+        if kind == "started":
+            in_flight[w].add(idx)
+            return
+        pending[w].discard(idx)
+        in_flight[w].discard(idx)
+        suspects[w].discard(idx)
+        _finish(idx, info, kind == "done")
+
+    def _on_exit(w: int, exitcode: Optional[int]):
+        crashed_on = in_flight[w] & pending[w]
+        in_flight[w].clear()
+        if not pending[w]:
+            return
+
+        if len(crashed_on) == 1:
+            idx = crashed_on.pop()
+            logger.error(f"Worker {w} exited (code {exitcode}) while running item {idx}. Quarantining it.")
+            pending[w].discard(idx)
+            suspects[w].discard(idx)
+            _finish(idx, {"run_id": f"{batch_id}-{idx}", "error": f"worker exited with code {exitcode} while running this item"}, False)
+        elif crashed_on:
+            logger.warning(f"Worker {w} exited (code {exitcode}) while running {len(crashed_on)} items. Re-running them one at a time.")
+            suspects[w] |= crashed_on
+        elif idle_crashes[w] < max_restarts:
+            idle_crashes[w] += 1
+        else:
+            logger.error(f"Worker {w} exited {idle_crashes[w] + 1} times with nothing in flight. Abandoning {len(pending[w])} items.")
+            for idx in sorted(pending[w]):
+                _finish(idx, {"run_id": f"{batch_id}-{idx}", "error": f"worker exited with code {exitcode}"}, False)
+            pending[w].clear()
+
+        if pending[w]:
+            restarts[w] += 1
+            logger.warning(f"Restarting worker {w} with {len(pending[w])} items left.")
+            procs[w] = _start(w)
+
+    procs = {w: _start(w) for w in range(workers) if pending[w]}
+
+    while procs:
+        readers = {reader: w for w, (_, reader) in procs.items()}
+        for reader in wait(list(readers), timeout=1.0):
+            w = readers[reader]
+            try:
+                _handle(reader.recv())
+            except EOFError:
+                # Every event the worker sent has been read by now.
+                proc, _ = procs.pop(w)
+                reader.close()
+                proc.join()
+                _on_exit(w, proc.exitcode)
+
+    report = {
+        "batch_id": batch_id,
+        "total": len(records),
+        "completed": len(completed),
+        "failed": failed,
+        "restarts": sum(restarts.values()),
+        "quota_requests": quota.granted if quota else None,
+        "runs": completed,
+    }
+    logger.info(f"Sharded run finished: {report['completed']}/{report['total']} completed, {len(failed)} failed, {report['restarts']} restarts")
+    return report
@@ -0,0 +1,51 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from src.logger.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class JsonFilePageSink:
+    """
+    Output sink for rendered pages.
+    Writer nodes hand finished pages to the sink and keep only the
+    returned reference in state, so page bodies are not held until the
+    graph run completes.
+    """
+    def __init__(self, output_dir: str = "output", per_run_dirs: bool = True):
+        self.output_dir = Path(output_dir)
+        self.per_run_dirs = per_run_dirs
+        self._lock = threading.Lock()
+        self.pages_written = 0
+        self.bytes_written = 0
+
+    def path_for(self, run_id: str, page_key: str) -> Path:
+        if self.per_run_dirs:
+            return self.output_dir / run_id / f"{page_key}.json"
+        return self.output_dir / f"{page_key}.json"
+
+    def write(self, run_id: str, page_key: str, content: Dict) -> Dict:
+        path = self.path_for(run_id, page_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        payload = json.dumps(content, indent=2)
+        with open(path, "w") as f:
+            f.write(payload)
+
+        with self._lock:
+            self.pages_written += 1
+            self.bytes_written += len(payload)
+
+        logger.info(f"Saved: {path}", extra={"run_id": run_id})
+        return {"page_key": page_key, "path": str(path), "bytes": len(payload)}
+
+
+def get_page_sink(config: Optional[Dict]) -> Optional[JsonFilePageSink]:
+    """
+    Returns the sink passed via `config["configurable"]["page_sink"]`,
+    or None when pages should be returned in `generated_pages`.
+    """
+    if not config:
+        return None
+    return config.get("configurable", {}).get("page_sink")
@@ -1,6 +1,7 @@
 import operator
 from typing import TypedDict, List, Dict, Annotated
 from src.schemas.models import ProductData, CompetitorProduct, UserQuestion
+from src.schemas.layouts import PageVariant
 
 class AgentState(TypedDict, total=False):
     """
@@ -11,7 +12,18 @@ class AgentState(TypedDict, total=False):
     raw_input: Dict
     
     product: ProductData
+    # Set by bulk ingestion; False means the comparison page is never scheduled.
+    comparison_feasible: bool
     competitor: CompetitorProduct
     questions: List[UserQuestion]
     
-    generated_pages: Annotated[List[Dict], operator.add]
\ No newline at end of file
+    # Variant mode: every variant is fanned out to its own writer via Send.
+    variants: List[PageVariant]
+    variant: PageVariant
+    
+    generated_pages: Annotated[List[Dict], operator.add]
+    # Lightweight references to pages handed to a page sink (streaming mode).
+    page_refs: Annotated[List[Dict], operator.add]
+    # Serialized size of product/competitor/questions, set by release_upstream
+    # when MEMORY_DEBUG is on.
+    upstream_serialized_bytes: int
\ No newline at end of file
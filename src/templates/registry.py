@@ -1,4 +1,5 @@
-from src.schemas.layouts import PageLayout, SectionBlueprint
+from typing import List
+from src.schemas.layouts import PageLayout, PageVariant, SectionBlueprint
 
 # FAQ PAGE LAYOUT
 FAQ_LAYOUT = PageLayout(
@@ -88,3 +89,33 @@ TEMPLATE_REGISTRY = {
     "comparison": COMPARISON_LAYOUT,
     "product": PRODUCT_LAYOUT
 }
+
+
+def resolve_variant_layout(variant: PageVariant) -> PageLayout:
+    """Looks up a variant's layout (layout_key, defaulting to page_key)."""
+    layout_key = variant.layout_key or variant.page_key
+    layout = TEMPLATE_REGISTRY.get(layout_key)
+    if not layout:
+        raise ValueError(f"No layout found for {layout_key} (variant '{variant.variant_id}')")
+    return layout
+
+def validate_variants(variants: List[PageVariant]):
+    """
+    Fails fast on unknown layouts and on duplicate output keys, before any
+    LLM call is made.
+    """
+    seen = set()
+    for variant in variants:
+        resolve_variant_layout(variant)
+        key = (variant.page_key, variant.variant_id)
+        if key in seen:
+            raise ValueError(f"Duplicate variant '{variant.page_key}.{variant.variant_id}'")
+        seen.add(key)
+
+def layout_requires_competitor(layout: PageLayout) -> bool:
+    """True if any section of the layout draws on competitor data."""
+    return any(
+        source.startswith("competitor")
+        for section in layout.structure
+        for source in section.data_sources
+    )
@@ -2,7 +2,8 @@ import re
 from typing import List
 from langchain_core.tools import tool
 from collections import Counter
-from src.schemas.models import ProductData, CompetitorProduct, UserQuestion
+from src.schemas.models import ProductData, CompetitorProduct, UserQuestion, PageSection, PageOutput
+from src.schemas.layouts import SectionBlueprint, PageLayout
 
 
 PAGE_TEMPLATES = {
@@ -72,6 +73,41 @@ def validate_competitor_logic(primary: ProductData, competitor: CompetitorProduc
         
     return "VALID"
 
+def validate_section_blueprint(section: PageSection, blueprint: SectionBlueprint) -> str:
+    """
+    Checks that a rendered section's content matches a block type its
+    blueprint allows: text/list as a string, faq as Q&A objects,
+    list/table as row objects.
+    Returns 'VALID' or a specific error message.
+    """
+    allowed = set(blueprint.allowed_blocks)
+    content = section.content
+
+    if isinstance(content, str):
+        ok, found = bool(allowed & {"text", "list"}), "text"
+    elif content and all(isinstance(c, UserQuestion) for c in content):
+        ok, found = "faq" in allowed, "faq"
+    else:
+        ok, found = bool(allowed & {"list", "table"}), "list/table"
+
+    if ok:
+        return "VALID"
+    return f"BLOCK ERROR: Section '{blueprint.section_id}' rendered {found} content. Allowed: {sorted(allowed)}."
+
+def validate_page_blueprint(page: PageOutput, layout: PageLayout) -> str:
+    """
+    Checks that a rendered page has one section per blueprint section;
+    sections are matched to the blueprint by position.
+    Returns 'VALID' or a specific error message.
+    """
+    expected = [b.section_id for b in layout.structure]
+
+    if len(page.sections) < len(expected):
+        return f"MISSING SECTIONS: '{layout.layout_id}' expects {expected}; missing {expected[len(page.sections):]}."
+    if len(page.sections) > len(expected):
+        return f"EXTRA SECTIONS: '{layout.layout_id}' expects {len(expected)} sections, got {len(page.sections)}."
+    return "VALID"
+
 
 @tool
 def format_benefits_html(benefits: List[str]) -> str:
@@ -0,0 +1,121 @@
+import json
+import pytest
+from src.ingestion.catalog import clean_prices, ingest_records, load_catalog, Vocabulary
+
+
+def _record(**overrides):
+    record = {
+        "Product Name": "GlowBoost Vitamin C Serum",
+        "Skin Type": "Oily, Combination",
+        "Key Ingredients": "Vitamin C, Hyaluronic Acid",
+        "Benefits": "Brightening, Fades dark spots",
+        "How to Use": "Apply 2–3 drops in the morning",
+        "Price": "₹699",
+    }
+    record.update(overrides)
+    return record
+
+
+@pytest.mark.parametrize("raw, price, currency", [
+    ("₹699", 699.0, "INR"),
+    ("Rs. 1,699", 1699.0, "INR"),
+    ("₹1,00,000", 100000.0, "INR"),
+    ("$12.50", 12.5, "USD"),
+    ("$1,299.99", 1299.99, "USD"),
+    ("€12,50", 12.5, "EUR"),
+    ("€12.50", 12.5, "EUR"),
+    ("€1.699,50", 1699.5, "EUR"),
+    (699, 699.0, ""),
+])
+def test_clean_prices_valid(raw, price, currency):
+    prices, currencies, errors = clean_prices([raw])
+    assert prices[0] == price
+    assert currencies[0] == currency
+    assert errors[0] == ""
+
+
+@pytest.mark.parametrize("raw", ["-5", "₹-699", "+10", "1.2.3", "$12,50", "€1,500", "call us", "699 only"])
+def test_clean_prices_rejects_garbage(raw):
+    prices, _, errors = clean_prices([raw])
+    assert prices[0] == 0.0
+    assert errors[0] != ""
+
+
+def test_clean_prices_missing_is_not_an_error():
+    prices, currencies, errors = clean_prices([None, "", "  "])
+    assert list(prices) == [0.0, 0.0, 0.0]
+    assert list(currencies) == ["", "", ""]
+    assert list(errors) == ["", "", ""]
+
+
+def test_ingest_records_reports_rejections():
+    records = [
+        _record(),
+        _record(Price="-5"),
+        _record(Price="1.2.3"),
+        _record(**{"Skin Type": 42}),
+        "not a record",
+        {"Product Name": "Incomplete"},
+    ]
+    products, report = ingest_records(records, batch_size=2)
+
+    assert [p.name for p in products] == ["GlowBoost Vitamin C Serum"]
+    assert report.total == 6
+    assert report.accepted == 1
+    assert [r.index for r in report.rejections] == [1, 2, 3, 4, 5]
+    assert "signed price" in report.rejections[0].reason
+    assert "Invalid list field" in report.rejections[2].reason
+
+
+def test_ingest_records_accepts_lists_and_missing_price():
+    products, report = ingest_records([_record(**{"Skin Type": ["Oily", " Dry "], "Price": None})])
+
+    assert report.rejections == []
+    assert products[0].skin_type == ["Oily", "Dry"]
+    assert products[0].price == 0.0
+    assert report.comparison_infeasible == 1
+
+
+def test_ingest_records_survives_non_string_names():
+    products, report = ingest_records([
+        _record(**{"Product Name": 42}),
+        _record(**{"Product Name": ["A"], "Price": "-5"}),
+        _record(),
+    ])
+
+    assert len(products) == 1
+    assert [r.index for r in report.rejections] == [0, 1]
+    assert all(r.product_name is None for r in report.rejections)
+    assert "Validation error" in report.rejections[0].reason
+    assert "signed price" in report.rejections[1].reason
+
+
+def test_rejected_records_do_not_grow_vocabulary():
+    _, report = ingest_records([
+        _record(**{"Key Ingredients": "Niacinamide", "Benefits": "Calming", "Skin Type": "Dry"}),
+        _record(**{"Product Name": 42, "Key Ingredients": "Retinol", "Benefits": "Firming", "Skin Type": "Oily"}),
+        _record(**{"Key Ingredients": "Zinc", "Benefits": "Matte", "Skin Type": 7}),
+    ])
+
+    assert report.accepted == 1
+    assert report.vocabulary_size == 3
+
+
+def test_vocabulary_interns_exact_terms():
+    vocab = Vocabulary()
+    first = vocab.split("Vitamin C, vitamin c")
+    second = vocab.split(["Vitamin C"])
+
+    assert first == ["Vitamin C", "vitamin c"]
+    assert second[0] is first[0]
+    assert len(vocab) == 2
+
+
+def test_load_catalog_accepts_path_objects(tmp_path):
+    jsonl = tmp_path / "catalog.jsonl"
+    jsonl.write_text("\n".join(json.dumps(_record(**{"Product Name": n})) for n in ["A", "B"]))
+    array = tmp_path / "catalog.json"
+    array.write_text(json.dumps([_record()]))
+
+    assert [r["Product Name"] for r in load_catalog(jsonl)] == ["A", "B"]
+    assert len(load_catalog(str(array))) == 1
@@ -0,0 +1,62 @@
+import time
+import asyncio
+import multiprocessing
+from src.limits import quota as quota_module
+from src.limits.quota import SharedQuota
+
+
+def _draw(quota, n):
+    for _ in range(n):
+        quota.acquire()
+
+
+def test_burst_is_granted_then_rate_applies():
+    quota = SharedQuota(requests_per_minute=600, burst=2)   # 10 per second
+
+    start = time.monotonic()
+    _draw(quota, 2)
+    burst_elapsed = time.monotonic() - start
+    _draw(quota, 3)
+    elapsed = time.monotonic() - start
+
+    assert burst_elapsed < 0.05
+    assert 0.25 <= elapsed < 1.0
+    assert quota.granted == 5
+
+
+def test_async_acquire_shares_the_bucket():
+    quota = SharedQuota(requests_per_minute=600, burst=1)
+
+    async def _draw_async(n):
+        await asyncio.gather(*[quota.aacquire() for _ in range(n)])
+
+    start = time.monotonic()
+    asyncio.run(_draw_async(4))
+
+    assert time.monotonic() - start >= 0.25
+    assert quota.granted == 4
+
+
+def test_spawned_workers_draw_from_one_budget():
+    ctx = multiprocessing.get_context("spawn")
+    quota = SharedQuota(requests_per_minute=1200, burst=1, ctx=ctx)   # 20 per second
+    procs = [ctx.Process(target=_draw, args=(quota, 5)) for _ in range(2)]
+
+    start = time.monotonic()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=30)
+    elapsed = time.monotonic() - start
+
+    assert [p.exitcode for p in procs] == [0, 0]
+    assert quota.granted == 10
+    # 10 requests with a burst of 1 need at least 9 refills at 20/s, whatever the split.
+    assert elapsed >= 0.45
+
+
+def test_acquire_without_installed_quota_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(quota_module, "_QUOTA", None)
+
+    quota_module.acquire_quota()
+    asyncio.run(quota_module.aacquire_quota())
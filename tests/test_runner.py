@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from src import graph, runner
+from src.agents import faq_agent
+from src.schemas.models import ProductData
+from src.schemas.layouts import PageVariant
+from src.sinks.page_sink import JsonFilePageSink
+
+
+@pytest.fixture
+def no_llm(monkeypatch):
+    async def no_questions(*args, **kwargs):
+        return []
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setattr(faq_agent, "generate_category_batch", no_questions)
+
+
+def _product(price):
+    return ProductData(
+        name="GlowBoost", skin_type=["Oily"], key_ingredients=["Vitamin C"],
+        benefits=["Brightening"], how_to_use="Apply daily", price=price
+    )
+
+
+def test_release_runs_when_every_variant_is_filtered_out(no_llm, monkeypatch, tmp_path):
+    monkeypatch.setattr(graph, "MEMORY_DEBUG", True)
+    variants = [PageVariant(variant_id="a", page_key="comparison")]
+
+    summary = asyncio.run(runner.run_product(
+        _product(price=0.0), page_sink=JsonFilePageSink(str(tmp_path)), variants=variants
+    ))
+
+    assert summary["page_refs"] == []
+    assert summary["serialized_bytes"]["pages"] == 0
+    # Product plus the FAQ agent's fallback questions.
+    assert summary["serialized_bytes"]["upstream"] > len(_product(price=0.0).model_dump_json())
+
+
+def test_serialized_sizes_are_skipped_without_memory_debug(no_llm, monkeypatch):
+    monkeypatch.setattr(graph, "MEMORY_DEBUG", False)
+    monkeypatch.setattr(runner, "MEMORY_DEBUG", False)
+    variants = [PageVariant(variant_id="a", page_key="comparison")]
+
+    summary = asyncio.run(runner.run_product(_product(price=0.0), variants=variants))
+
+    assert summary["serialized_bytes"] == {"pages": None, "upstream": None}
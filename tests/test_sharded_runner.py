@@ -0,0 +1,60 @@
+import os
+import asyncio
+from pathlib import Path
+from src.limits.quota import aacquire_quota
+from src.sharded_runner import run_sharded
+
+
+async def fake_run_product(record, page_sink=None, run_id=None):
+    """Stands in for run_product in spawned workers; logs each completed run."""
+    await aacquire_quota()
+    await asyncio.sleep(record.get("delay", 0.05))
+    if record.get("crash"):
+        os._exit(1)
+    if record.get("error"):
+        raise ValueError("bad record")
+    with open(Path(page_sink.output_dir) / "runs.log", "a") as f:
+        f.write(f"{record['name']}\n")
+    return {"page_refs": []}
+
+
+def _runs(tmp_path):
+    return (tmp_path / "runs.log").read_text().split()
+
+
+def test_all_items_complete_once_across_workers(tmp_path):
+    records = [{"name": f"p{i}"} for i in range(6)]
+
+    report = run_sharded(records, workers=2, output_dir=str(tmp_path), run_item=fake_run_product)
+
+    assert report["completed"] == 6
+    assert report["failed"] == {}
+    assert report["restarts"] == 0
+    assert sorted(_runs(tmp_path)) == sorted(r["name"] for r in records)
+
+
+def test_crashing_item_is_quarantined_and_the_rest_complete_once(tmp_path):
+    records = [{"name": f"p{i}"} for i in range(6)]
+    # Worker 0 runs 0, 2, 4 concurrently; item 2 kills the process while 0 and 4 are in flight.
+    records[2] = {"name": "p2", "crash": True, "delay": 0.01}
+    records[1] = {"name": "p1", "error": True}
+
+    report = run_sharded(records, workers=2, concurrency_per_worker=3, output_dir=str(tmp_path), run_item=fake_run_product)
+
+    assert report["completed"] == 4
+    assert sorted(report["failed"]) == [1, 2]
+    assert "while running this item" in report["failed"][2]["error"]
+    assert report["failed"][1]["error"] == "bad record"
+    # One restart to isolate the suspects, one after the culprit is found.
+    assert report["restarts"] == 2
+    assert sorted(_runs(tmp_path)) == ["p0", "p3", "p4", "p5"]
+
+
+def test_env_rate_limit_becomes_one_shared_quota(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_REQUESTS_PER_MINUTE", "6000")
+    records = [{"name": f"p{i}"} for i in range(4)]
+
+    report = run_sharded(records, workers=2, output_dir=str(tmp_path), run_item=fake_run_product)
+
+    # Counted by the shared quota, so neither worker fell back to its own.
+    assert report["quota_requests"] == 4
@@ -0,0 +1,26 @@
+import pytest
+from pydantic import ValidationError
+from src.schemas.layouts import PageVariant
+from src.templates.registry import validate_variants
+
+
+@pytest.mark.parametrize("variant_id", ["../x", "a/b", "a.b", ""])
+def test_variant_id_cannot_escape_the_run_directory(variant_id):
+    with pytest.raises(ValidationError):
+        PageVariant(variant_id=variant_id, page_key="product")
+
+
+def test_validate_variants_rejects_duplicates_and_unknown_layouts():
+    validate_variants([
+        PageVariant(variant_id="a", page_key="product"),
+        PageVariant(variant_id="a", page_key="faq"),
+    ])
+
+    with pytest.raises(ValueError, match="Duplicate variant 'product.a'"):
+        validate_variants([
+            PageVariant(variant_id="a", page_key="product"),
+            PageVariant(variant_id="a", page_key="product", tone="playful"),
+        ])
+
+    with pytest.raises(ValueError, match="No layout found"):
+        validate_variants([PageVariant(variant_id="a", page_key="product", layout_key="missing")])
@@ -0,0 +1,142 @@
+import json
+import pytest
+from types import SimpleNamespace
+from src.agents import writer_agent
+from src.schemas.models import ProductData
+from src.templates.registry import TEMPLATE_REGISTRY
+
+PRODUCT_LAYOUT = TEMPLATE_REGISTRY["product"]
+
+
+def _page(n_sections):
+    return {
+        "page_type": "Product Description Page",
+        "meta_title": "GlowBoost",
+        "meta_description": "Vitamin C serum",
+        "sections": [{"heading": f"Section {i}", "content": f"<p>{i}</p>"} for i in range(n_sections)],
+    }
+
+
+def _chunks(text, size=7):
+    return [SimpleNamespace(text=text[i:i + size]) for i in range(0, len(text), size)]
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    """
+    Stubs the Gemini client with scripted attempts (a list of chunks or an
+    exception each) and records every custom stream event.
+    """
+    attempts, events, streamed = [], [], []
+
+    class FakeLLM:
+        def __init__(self, **kwargs):
+            pass
+
+        def bind(self, **kwargs):
+            return self
+
+        def stream(self, prompt):
+            script = attempts.pop(0)
+            if isinstance(script, Exception):
+                raise script
+            for chunk in script:
+                streamed.append(chunk.text)
+                yield chunk
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setattr(writer_agent, "ChatGoogleGenerativeAI", FakeLLM)
+    monkeypatch.setattr(writer_agent, "get_stream_writer", lambda: events.append)
+    monkeypatch.setattr(writer_agent.time, "sleep", lambda s: None)
+
+    state = {
+        "run_id": "test-run",
+        "product": ProductData(
+            name="GlowBoost", skin_type=["Oily"], key_ingredients=["Vitamin C"],
+            benefits=["Brightening"], how_to_use="Apply daily", price=699.0
+        ),
+        "questions": [],
+    }
+    return SimpleNamespace(attempts=attempts, events=events, streamed=streamed, state=state)
+
+
+def _sections(events):
+    return [e["index"] for e in events if e["type"] == "section"]
+
+
+def test_sections_are_emitted_in_order_while_streaming(writer):
+    text = json.dumps(_page(3))
+    writer.attempts.append(_chunks(text))
+
+    result = writer_agent.render_page(writer.state, PRODUCT_LAYOUT, "product")
+
+    assert _sections(writer.events) == [0, 1, 2]
+    assert [e["section_id"] for e in writer.events if e["type"] == "section"] == ["hero", "benefits", "usage"]
+    assert writer.events[-1] == {"type": "page_check", "run_id": "test-run", "page_key": "product", "blueprint_check": "VALID"}
+    assert len(result.sections) == 3
+
+
+def test_first_section_is_emitted_before_the_stream_ends(writer, monkeypatch):
+    text = json.dumps(_page(3))
+    writer.attempts.append(_chunks(text))
+    seen_at_first_event = []
+
+    def record(event):
+        if event["type"] == "section" and not seen_at_first_event:
+            seen_at_first_event.append("".join(writer.streamed))
+        writer.events.append(event)
+
+    monkeypatch.setattr(writer_agent, "get_stream_writer", lambda: record)
+    writer_agent.render_page(writer.state, PRODUCT_LAYOUT, "product")
+
+    assert len(seen_at_first_event[0]) < len(text)
+
+
+def test_truncated_stream_is_retried_from_scratch(writer):
+    text = json.dumps(_page(3))
+    # The first attempt breaks off inside the first section, before anything is emitted.
+    writer.attempts.append(_chunks(text[:text.index("Section 0") + 5]))
+    writer.attempts.append(_chunks(text))
+
+    result = writer_agent.render_page(writer.state, PRODUCT_LAYOUT, "product")
+
+    assert _sections(writer.events) == [0, 1, 2]
+    assert [s.heading for s in result.sections] == ["Section 0", "Section 1", "Section 2"]
+
+
+def test_truncated_stream_after_emission_raises(writer):
+    text = json.dumps(_page(3))
+    writer.attempts.append(_chunks(text[:text.index("Section 2") + 5]))
+
+    with pytest.raises(ValueError):
+        writer_agent.render_page(writer.state, PRODUCT_LAYOUT, "product")
+
+    assert _sections(writer.events) == [0, 1]
+
+
+def test_missing_sections_are_flagged(writer):
+    writer.attempts.append(_chunks(json.dumps(_page(2))))
+
+    writer_agent.render_page(writer.state, PRODUCT_LAYOUT, "product")
+
+    assert _sections(writer.events) == [0, 1]
+    check = writer.events[-1]["blueprint_check"]
+    assert check.startswith("MISSING SECTIONS") and "usage" in check
+
+
+def test_failed_request_is_retried_before_any_output(writer):
+    writer.attempts.extend([RuntimeError("503"), _chunks(json.dumps(_page(3)))])
+
+    writer_agent.render_page(writer.state, PRODUCT_LAYOUT, "product")
+
+    assert _sections(writer.events) == [0, 1, 2]
+
+
+def test_static_prefix_is_cached_per_layout_instance():
+    prefix = writer_agent.render_static_prefix(PRODUCT_LAYOUT)
+    variant = PRODUCT_LAYOUT.model_copy(update={"description": "Clinical product page"})
+
+    assert writer_agent.render_static_prefix(PRODUCT_LAYOUT) is prefix
+    assert variant.layout_id == PRODUCT_LAYOUT.layout_id
+    assert "Clinical product page" in writer_agent.render_static_prefix(variant)
+    assert "Clinical product page" not in prefix